@@ -1,81 +1,274 @@
-import json
+import copy
 import os
+import signal
+import time
+import orjson
+import msgspec
 import discord
 from discord.ext import commands
 from discord import app_commands
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for
+from flask import Flask, Response, render_template, request, jsonify, session, redirect, url_for
+from flask.json.provider import DefaultJSONProvider
 from flask_session import Session
-from threading import Thread
+from hypercorn.asyncio import serve
+from hypercorn.config import Config
+from threading import Lock, RLock, Timer
 import asyncio
 from datetime import datetime, timedelta
-import pytz
-from functools import wraps
+from functools import lru_cache, wraps
+from zoneinfo import ZoneInfo
 
 TOKEN = os.environ.get("DISCORD_BOT_TOKEN")
 
 # Render dashboard URL (no more Replit redirect)
 DASHBOARD_URL = os.environ.get("DASHBOARD_URL", "https://bible-study-bot-14vt.onrender.com")
 
+# Set PRETTY_JSON=1 to keep schedule.json indented for hand editing
+PRETTY_JSON = os.environ.get("PRETTY_JSON") == "1"
+
 SCHEDULE_FILE = "schedule.json"
 ACTIVE_MESSAGES_FILE = "active_messages.json"
-DM_LOG_FILE = "dm_log.json"
-CHAT_HISTORY_FILE = "chat_history.json"
+DM_LOG_FILE = "dm_log.jsonl"
+CHAT_HISTORY_FILE = "chat_history.jsonl"
+LOG_HISTORY_LIMIT = 100  # Records kept from the tail of each JSONL log
+LOG_COMPACT_THRESHOLD = LOG_HISTORY_LIMIT * 10  # Lines before a log is rewritten
+LOG_COMPACT_OP_RATIO = 0.25  # Share of delete/rename op lines before a log is rewritten
+LOG_COMPACT_INTERVAL = timedelta(hours=1)
+SCHEDULE_FLUSH_DELAY = 0.3  # Seconds to coalesce schedule saves before writing
+DISCORD_UPDATE_DELAY = 0.3  # Seconds to coalesce dashboard-triggered message refreshes
+REMINDER_MIN_SLEEP = 30  # Seconds
+REMINDER_MAX_SLEEP = 15 * 60  # Seconds, keeps the loop reactive to schedule edits
 ALLOWED_GUILD_ID = 1322203707768569856  # Lock bot to this server
 REMINDER_CHANNEL_ID = 1443856322817953855  # Channel for 6-hour reminder pings
 START_DATE = datetime(2025, 11, 29)  # Saturday, November 29, 2025
-BRISBANE_TZ = pytz.timezone('Australia/Brisbane')
+BRISBANE_TZ = ZoneInfo('Australia/Brisbane')
 STUDY_HOUR = 19  # 7 PM
 STUDY_MINUTE = 30
 
+# Parsed JSON file contents keyed by path, stored as (st_mtime_ns, data)
+_JSON_CACHE = {}
+
+def _load(path):
+    """Parse the JSON document stored at path."""
+    with open(path, "rb") as f:
+        return orjson.loads(f.read())
+
+def _replace_file(path, data):
+    """Write data to path via a temp file and rename, so readers never see a partial file."""
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+def _dump(obj, path, pretty=False):
+    """Serialize obj as JSON to path."""
+    _replace_file(path, orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0))
+
+def _read_json(path, default):
+    """Return a copy of the JSON stored at path, re-parsing only when the file changes."""
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        mtime = None
+
+    cached = _JSON_CACHE.get(path)
+    if cached is None or cached[0] != mtime:
+        if mtime is None:
+            return copy.deepcopy(default)
+        try:
+            cached = (mtime, _load(path))
+        except orjson.JSONDecodeError:
+            return copy.deepcopy(default)
+        _JSON_CACHE[path] = cached
+
+    return copy.deepcopy(cached[1])
+
+def _cache_json(path, data):
+    """Make data the cached contents of path ahead of it being written."""
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        mtime = None
+    _JSON_CACHE[path] = (mtime, copy.deepcopy(data))
+
+def _write_json(path, data, pretty=False):
+    """Write data as JSON to path and refresh its cache entry."""
+    _dump(data, path, pretty)
+    _JSON_CACHE[path] = (os.stat(path).st_mtime_ns, copy.deepcopy(data))
+
+# Append-mode handles for JSONL logs, opened on first write
+_APPEND_HANDLES = {}
+
+# Logs are written from both the bot loop and Flask threads; this guards the files,
+# their append handles and their cache entries. Re-entrant for compact_logs.
+_log_lock = RLock()
+
+def _parse_jsonl_line(line):
+    """Decode one JSONL line, or return None for a torn or corrupt line."""
+    try:
+        return orjson.loads(line)
+    except orjson.JSONDecodeError:
+        return None
+
+def _apply_record(records, record):
+    """Add a JSONL record to records, applying delete/rename ops to the ones before it."""
+    op = record.get("op")
+    if op is None:
+        records.append(record)
+    elif op == "delete":
+        records[:] = [r for r in records if r.get("from") != record["from"]]
+    elif op == "rename":
+        # Replace rather than edit matching records so read-only snapshots stay unchanged
+        records[:] = [
+            {**r, "username": record["username"]} if r.get("from") == record["from"] else r
+            for r in records
+        ]
+
+def _read_jsonl(path, copy_records=True):
+    """Return a copy of the last LOG_HISTORY_LIMIT records in a JSON Lines file.
+
+    With copy_records=False the records are shared with the cache and must not be modified.
+    """
+    with _log_lock:
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return []
+
+        cached = _JSON_CACHE.get(path)
+        if cached is None or cached[0] != mtime:
+            with open(path, "rb") as f:
+                lines = f.read().splitlines()
+
+            # Parse from the end until we have the retained tail, keeping any ops in between
+            tail = []
+            kept = 0
+            for line in reversed(lines):
+                if not line.strip():
+                    continue
+                record = _parse_jsonl_line(line)
+                if record is None:
+                    continue
+                tail.append(record)
+                if "op" not in record:
+                    kept += 1
+                    if kept == LOG_HISTORY_LIMIT:
+                        break
+
+            records = []
+            for record in reversed(tail):
+                _apply_record(records, record)
+            cached = (mtime, records)
+            _JSON_CACHE[path] = cached
+
+        if not copy_records:
+            return tuple(cached[1])
+        return copy.deepcopy(cached[1])
+
+def _append_jsonl(path, entry):
+    """Append a single record to a JSON Lines file and to its cache entry."""
+    _extend_jsonl(path, [entry])
+
+def _extend_jsonl(path, entries):
+    """Append records to a JSON Lines file and its cache entry in one write."""
+    if not entries:
+        return
+    data = b"".join(orjson.dumps(entry) + b"\n" for entry in entries)
+    with _log_lock:
+        try:
+            mtime_before = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            mtime_before = None
+
+        f = _APPEND_HANDLES.get(path)
+        if f is None:
+            f = _APPEND_HANDLES[path] = open(path, "ab")
+        f.write(data)
+        f.flush()
+
+        # Only extend the cached tail if it was in sync with the file before this write
+        cached = _JSON_CACHE.get(path)
+        if cached is not None and cached[0] == mtime_before:
+            records = cached[1]
+        elif mtime_before is None:
+            records = []
+        else:
+            _JSON_CACHE.pop(path, None)
+            return
+
+        for entry in copy.deepcopy(entries):
+            _apply_record(records, entry)
+        if len(records) > LOG_HISTORY_LIMIT:
+            del records[:-LOG_HISTORY_LIMIT]
+        _JSON_CACHE[path] = (os.stat(path).st_mtime_ns, records)
+
+def _write_jsonl(path, entries):
+    """Rewrite a JSON Lines file with entries and refresh its cache entry."""
+    with _log_lock:
+        f = _APPEND_HANDLES.pop(path, None)
+        if f is not None:
+            f.close()
+
+        _replace_file(path, b"".join(orjson.dumps(entry) + b"\n" for entry in entries))
+        _JSON_CACHE[path] = (os.stat(path).st_mtime_ns, copy.deepcopy(list(entries[-LOG_HISTORY_LIMIT:])))
+
+def _migrate_legacy_log(legacy_path, path):
+    """Convert a JSON array log from older versions into JSON Lines."""
+    if os.path.exists(path) or not os.path.exists(legacy_path):
+        return
+    try:
+        _write_jsonl(path, _load(legacy_path))
+        os.remove(legacy_path)
+    except Exception as e:
+        print(f"Error migrating {legacy_path}: {e}")
+
+def compact_logs():
+    """Rewrite JSONL logs as their retained tail once they grow or collect too many ops."""
+    for path in (DM_LOG_FILE, CHAT_HISTORY_FILE):
+        try:
+            # Hold the lock from the read to the rewrite so no append lands in between
+            with _log_lock:
+                with open(path, "rb") as f:
+                    lines = [line for line in f.read().splitlines() if line.strip()]
+                records = [_parse_jsonl_line(line) for line in lines]
+                # Torn lines count as ops so a rewrite drops them
+                op_count = sum(1 for record in records if record is None or "op" in record)
+                if len(lines) > LOG_COMPACT_THRESHOLD or op_count > len(lines) * LOG_COMPACT_OP_RATIO:
+                    _write_jsonl(path, _read_jsonl(path, copy_records=False))
+        except FileNotFoundError:
+            continue
+        except Exception as e:
+            print(f"Error compacting {path}: {e}")
+
 def log_dm(user_id, user_name, message_type, status="sent"):
     """Log DM sent to a user."""
     try:
-        logs = []
-        if os.path.exists(DM_LOG_FILE):
-            with open(DM_LOG_FILE, "r") as f:
-                logs = json.load(f)
-        
-        logs.append({
+        _append_jsonl(DM_LOG_FILE, {
             "timestamp": datetime.now(BRISBANE_TZ).isoformat(),
             "user_id": user_id,
             "user_name": user_name,
             "type": message_type,
             "status": status
         })
-        
-        # Keep only last 100 entries
-        if len(logs) > 100:
-            logs = logs[-100:]
-        
-        with open(DM_LOG_FILE, "w") as f:
-            json.dump(logs, f, indent=4)
     except Exception as e:
         print(f"Error logging DM: {e}")
 
+def load_dm_log():
+    """Load the most recent DM log entries (read-only)."""
+    return _read_jsonl(DM_LOG_FILE, copy_records=False)
+
 def load_chat_history():
-    """Load chat history."""
-    if os.path.exists(CHAT_HISTORY_FILE):
-        with open(CHAT_HISTORY_FILE, "r") as f:
-            return json.load(f)
-    return []
+    """Load chat history (read-only)."""
+    return _read_jsonl(CHAT_HISTORY_FILE, copy_records=False)
 
 def save_chat_message(from_user, text):
     """Save a message to chat history, organized by user."""
     try:
-        messages = load_chat_history()
-        
-        messages.append({
+        _append_jsonl(CHAT_HISTORY_FILE, {
             "from": from_user,
             "text": text,
             "timestamp": datetime.now(BRISBANE_TZ).isoformat()
         })
-        
-        # Keep only last 100 messages
-        if len(messages) > 100:
-            messages = messages[-100:]
-        
-        with open(CHAT_HISTORY_FILE, "w") as f:
-            json.dump(messages, f, indent=4)
     except Exception as e:
         print(f"Error saving chat message: {e}")
 
@@ -85,22 +278,20 @@ def get_dm_conversations():
         messages = load_chat_history()
         conversations = {}
         
-        for msg in messages:
+        # Walk newest first so the first message seen per user is their latest
+        for msg in reversed(messages):
             from_user = msg["from"]
-            if from_user.startswith("user_"):
-                user_id = from_user.replace("user_", "")
-                username = msg.get("username", "Unknown")
-                if user_id not in conversations:
-                    conversations[user_id] = {
-                        "username": username,
-                        "last_message": msg["text"],
-                        "last_timestamp": msg["timestamp"],
-                        "user_from": from_user
-                    }
-                else:
-                    conversations[user_id]["last_message"] = msg["text"]
-                    conversations[user_id]["last_timestamp"] = msg["timestamp"]
-                    conversations[user_id]["username"] = username
+            if not from_user.startswith("user_"):
+                continue
+            user_id = from_user[5:]
+            if user_id in conversations:
+                continue
+            conversations[user_id] = {
+                "username": msg.get("username", "Unknown"),
+                "last_message": msg["text"],
+                "last_timestamp": msg["timestamp"],
+                "user_from": from_user
+            }
         
         return conversations
     except Exception as e:
@@ -137,46 +328,31 @@ async def fetch_dm_history_from_discord(user_id):
         if not dm_channel:
             dm_channel = await user.create_dm()
         
-        # Fetch message history (get last 50 messages)
-        messages = []
-        async for msg in dm_channel.history(limit=50):
-            # Skip bot's own messages (we already have those as "admin")
-            # Reverse to get chronological order
-            messages.insert(0, msg)
+        # Fetch message history (get last 50 messages), newest first
+        messages = [msg async for msg in dm_channel.history(limit=50)]
+        # Reverse to get chronological order
+        messages.reverse()
         
         # Load existing chat history
         existing_messages = load_chat_history()
-        existing_user_messages = {msg["timestamp"] for msg in existing_messages if msg.get("from") == f"user_{user_id}"}
+        user_key = f"user_{user_id}"
+        seen = {msg["timestamp"] for msg in existing_messages if msg["from"] == user_key}
         
-        # Add new messages to chat history
+        # Append user messages we don't have yet in one write, skipping the bot's own
+        # (they're stored as "admin")
+        new_messages = []
         for msg in messages:
             timestamp = msg.created_at.isoformat()
-            
-            # Skip if already exists
-            if timestamp in existing_user_messages:
-                continue
-            
-            # Skip bot's own messages (they're stored as "admin")
-            if msg.author == bot.user:
+            if msg.author.id == _BOT_USER_ID or timestamp in seen:
                 continue
-            
-            # Add user message
-            existing_messages.append({
-                "from": f"user_{user_id}",
+            new_messages.append({
+                "from": user_key,
                 "username": msg.author.name,
                 "user_id": str(user_id),
                 "text": msg.content,
                 "timestamp": timestamp
             })
-            existing_user_messages.add(timestamp)
-        
-        # Keep only last 100 messages total
-        if len(existing_messages) > 100:
-            existing_messages = existing_messages[-100:]
-        
-        # Save updated history
-        with open(CHAT_HISTORY_FILE, "w") as f:
-            json.dump(existing_messages, f, indent=4)
+        _extend_jsonl(CHAT_HISTORY_FILE, new_messages)
         
         return True
     except Exception as e:
@@ -189,39 +365,50 @@ def get_date_for_week(week_index):
 
 def format_date(date):
     """Format date as 'Sat 29/11'."""
-    return date.strftime("%a %d/%m").replace("Sat", "Sat").replace("Sun", "Sun").replace("Mon", "Mon").replace("Tue", "Tue").replace("Wed", "Wed").replace("Thu", "Thu").replace("Fri", "Fri")
+    return _format_ordinal(date.toordinal())
 
-def parse_date_string(date_str):
-    """Parse 'Sat 29/11' into the next matching Brisbane datetime."""
+@lru_cache(maxsize=256)
+def _format_ordinal(ordinal):
+    return datetime.fromordinal(ordinal).strftime("%a %d/%m")
+
+@lru_cache(maxsize=256)
+def _parse_date_cached(date_str, year):
+    """Parse 'Sat 29/11' into the Brisbane study datetime for the given year."""
     try:
         day, month = date_str.split()[-1].split('/')
-        now = datetime.now(BRISBANE_TZ)
-        year = now.year
+        return datetime(year, int(month), int(day), STUDY_HOUR, STUDY_MINUTE, tzinfo=BRISBANE_TZ)
+    except Exception:
+        return None
 
-        target = BRISBANE_TZ.localize(datetime(year, int(month), int(day), STUDY_HOUR, STUDY_MINUTE, 0))
+def parse_date_string(date_str, now=None):
+    """Parse 'Sat 29/11' into the next matching Brisbane datetime."""
+    if now is None:
+        now = datetime.now(BRISBANE_TZ)
+    target = _parse_date_cached(date_str, now.year)
 
-        # If the date has already passed this year, roll to next year
-        if target < now:
-            target = BRISBANE_TZ.localize(datetime(year + 1, int(month), int(day), STUDY_HOUR, STUDY_MINUTE, 0))
+    # If the date has already passed this year, roll to next year
+    if target is not None and target < now:
+        target = _parse_date_cached(date_str, now.year + 1)
 
-        return target
-    except Exception:
-        return None
+    return target
 
-def has_past_study_time(now):
+def has_past_study_time(now=None):
     """Return True when the study time for the given day has already passed."""
+    if now is None:
+        now = datetime.now(BRISBANE_TZ)
     return now.hour > STUDY_HOUR or (now.hour == STUDY_HOUR and now.minute >= STUDY_MINUTE)
 
-def get_next_study_time():
+def get_next_study_time(now=None):
     """Get the next Bible study time (7:30 PM Brisbane time)."""
-    now = datetime.now(BRISBANE_TZ)
+    if now is None:
+        now = datetime.now(BRISBANE_TZ)
     
     # Try to get date from first schedule entry
     current_schedule = load_schedule()
     if current_schedule:
         first_entry = current_schedule[0]
         if isinstance(first_entry, dict) and "date" in first_entry:
-            scheduled_date = parse_date_string(first_entry["date"])
+            scheduled_date = parse_date_string(first_entry["date"], now)
             if scheduled_date:
                 if scheduled_date > now:
                     return scheduled_date
@@ -236,32 +423,35 @@ def get_next_study_time():
 
     return next_study
 
+@lru_cache(maxsize=1)
+def _test_reminder_messages(minute, schedule_version):
+    """(leader_id, 24h text, 6h text) for the test reminders, memoised per minute and schedule version."""
+    current_schedule = load_schedule(None)
+    if not current_schedule:
+        return None
 
-def get_next_schedule_date(schedule):
-    """Return the next available Saturday at the study time for a new schedule entry."""
-    now = datetime.now(BRISBANE_TZ)
-
-    if schedule:
-        last_entry = schedule[-1]
-        last_date = parse_date_string(last_entry.get("date", "")) if isinstance(last_entry, dict) else None
-        if last_date:
-            return last_date + timedelta(days=7)
-
-    days_until_saturday = (5 - now.weekday()) % 7
-    if days_until_saturday == 0 and has_past_study_time(now):
-        days_until_saturday = 7
+    leader_entry = current_schedule[0]
+    leader_id = leader_entry["id"] if isinstance(leader_entry, dict) else leader_entry
+    study_timestamp = int(get_next_study_time().timestamp())
+    return (
+        leader_id,
+        f"📖 Test Reminder (24h): You're leading Bible Study on <t:{study_timestamp}:F> (<t:{study_timestamp}:R>)!",
+        f"🧪 Test: <@{leader_id}> - Your Bible Study session is <t:{study_timestamp}:R> 📖"
+    )
 
-    next_saturday = now + timedelta(days=days_until_saturday)
-    return next_saturday.replace(hour=STUDY_HOUR, minute=STUDY_MINUTE, second=0, microsecond=0)
+def get_test_reminder_messages():
+    """Return the current test reminder texts, or None if the schedule is empty."""
+    return _test_reminder_messages(int(time.time() // 60), _schedule_version.get("default", 0))
 
 
-def get_next_schedule_date(schedule):
+def get_next_schedule_date(schedule, now=None):
     """Return the next available Saturday at the study time for a new schedule entry."""
-    now = datetime.now(BRISBANE_TZ)
+    if now is None:
+        now = datetime.now(BRISBANE_TZ)
 
     if schedule:
         last_entry = schedule[-1]
-        last_date = parse_date_string(last_entry.get("date", "")) if isinstance(last_entry, dict) else None
+        last_date = parse_date_string(last_entry.get("date", ""), now) if isinstance(last_entry, dict) else None
         if last_date:
             return last_date + timedelta(days=7)
 
@@ -272,33 +462,41 @@ def get_next_schedule_date(schedule):
     next_saturday = now + timedelta(days=days_until_saturday)
     return next_saturday.replace(hour=STUDY_HOUR, minute=STUDY_MINUTE, second=0, microsecond=0)
 
-def get_countdown():
+def get_countdown(now=None):
     """Get countdown in seconds to next study time."""
-    now = datetime.now(BRISBANE_TZ)
-    next_study = get_next_study_time()
+    if now is None:
+        now = datetime.now(BRISBANE_TZ)
+    next_study = get_next_study_time(now)
     delta = next_study - now
     return max(0, int(delta.total_seconds()))
 
+def get_reminder_sleep_seconds(now=None):
+    """Get how long the reminder loop can sleep before the next reminder or rotation."""
+    if now is None:
+        now = datetime.now(BRISBANE_TZ)
+    next_study = get_next_study_time(now)
+    
+    targets = (next_study - timedelta(hours=24), next_study - timedelta(hours=6), next_study)
+    upcoming = [target for target in targets if target > now]
+    if not upcoming:
+        return REMINDER_MAX_SLEEP
+    
+    seconds = (min(upcoming) - now).total_seconds() - 30
+    return max(REMINDER_MIN_SLEEP, min(REMINDER_MAX_SLEEP, seconds))
+
 def load_active_messages():
-    try:
-        with open(ACTIVE_MESSAGES_FILE, "r") as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        return []
+    """Load tracked schedule messages as a {message_id: msg_info} dict."""
+    return {m["message_id"]: m for m in _read_json(ACTIVE_MESSAGES_FILE, [])}
 
 def save_active_messages(messages):
-    with open(ACTIVE_MESSAGES_FILE, "w") as f:
-        json.dump(messages, f, indent=4)
+    _write_json(ACTIVE_MESSAGES_FILE, list(messages.values()))
 
 def load_all_schedules():
-    try:
-        with open(SCHEDULE_FILE, "r") as f:
-            data = json.load(f)
-            return data.get("schedules", {})
-    except (FileNotFoundError, json.JSONDecodeError):
-        with open(SCHEDULE_FILE, "w") as f:
-            json.dump({"schedules": {}}, f)
-        return {}
+    # A saved document stays pending until it is on disk, so serve it ahead of the file cache
+    pending = _pending_schedule
+    if pending is not None:
+        return copy.deepcopy(pending["schedules"])
+    return _read_json(SCHEDULE_FILE, {}).get("schedules", {})
 
 def load_schedule(guild_id=None):
     """Load schedule for a specific guild or default."""
@@ -308,36 +506,141 @@ def load_schedule(guild_id=None):
 
 def save_schedule(schedule_list, guild_id=None):
     """Save schedule for a specific guild or default."""
+    global _pending_schedule, _save_timer, _next_rotate_ts, _schedule_snapshot
     guild_key = str(guild_id) if guild_id else "default"
-    all_schedules = load_all_schedules()
-    all_schedules[guild_key] = schedule_list
-    with open(SCHEDULE_FILE, "w") as f:
-        json.dump({"schedules": all_schedules}, f, indent=4)
-
-def get_user_ids(schedule_list):
-    return [entry["id"] if isinstance(entry, dict) else entry for entry in schedule_list]
-
-def find_user_index(schedule_list, user_id):
-    for i, entry in enumerate(schedule_list):
-        entry_id = entry["id"] if isinstance(entry, dict) else entry
-        if entry_id == user_id:
-            return i
-    return -1
+    with _save_lock:
+        all_schedules = load_all_schedules()
+        all_schedules[guild_key] = schedule_list
+        data = {"schedules": all_schedules}
+
+        # Serve the new state from the cache right away and coalesce the disk write
+        _pending_schedule = data
+        _cache_json(SCHEDULE_FILE, data)
+        if guild_key == "default":
+            with _snapshot_lock:
+                _schedule_snapshot = copy.deepcopy(schedule_list)
+
+        # Bump the version only once the new state is readable, so lock-free readers
+        # that see the new version can't rebuild from the old schedule
+        _schedule_version[guild_key] = _schedule_version.get(guild_key, 0) + 1
+        _next_rotate_ts = None
+        if _save_timer is not None:
+            _save_timer.cancel()
+        _save_timer = Timer(SCHEDULE_FLUSH_DELAY, flush_schedule)
+        _save_timer.daemon = True
+        _save_timer.start()
+
+# Start time of the first scheduled session; advance_schedule_if_needed is a no-op before it
+_next_rotate_ts = None
+
+# Latest schedules document waiting to be written, and the timer that writes it.
+# save_schedule runs on both the bot loop and Flask threads, so both are guarded by _save_lock.
+# Re-entrant so mutate_default_schedule can hold it across its save.
+_save_lock = RLock()
+_pending_schedule = None
+_save_timer = None
+
+# Held for the whole of a flush so overlapping flushes write in order
+_flush_lock = Lock()
+
+def flush_schedule():
+    """Write the pending schedule to disk, if there is one."""
+    global _pending_schedule
+    with _flush_lock:
+        with _save_lock:
+            data = _pending_schedule
+        if data is None:
+            return
+
+        # Write outside _save_lock so saves on the bot loop never wait on file IO
+        _write_json(SCHEDULE_FILE, data, pretty=PRETTY_JSON)
+        with _save_lock:
+            # Keep serving a newer save that arrived during the write until it's flushed too
+            if _pending_schedule is data:
+                _pending_schedule = None
+
+# Save counter per schedule key, used to invalidate rendered schedule text
+_schedule_version = {}
+
+# Default schedule as last saved, served to dashboard requests on the Flask thread.
+# A new list is published on every save, so the published one is never mutated.
+_snapshot_lock = Lock()
+_schedule_snapshot = load_schedule(None)
+
+def get_schedule_snapshot():
+    """Return the in-memory default schedule; callers must copy before mutating."""
+    with _snapshot_lock:
+        return _schedule_snapshot
+
+# Rendered schedule text per guild id, stored as (schedule version, text)
+_format_cache = {}
+
+# {user_id: position} maps per schedule key, stored as (schedule version, map)
+_schedule_index_cache = {}
+
+def _get_index(guild_id=None):
+    """Return the {user_id: position} map for a schedule."""
+    guild_key = str(guild_id) if guild_id else "default"
+    # Read the version before the schedule; a save in between only makes this entry stale early
+    version = _schedule_version.get(guild_key, 0)
+    cached = _schedule_index_cache.get(guild_key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    index = {}
+    for i, entry in enumerate(load_schedule(guild_id)):
+        index.setdefault(entry["id"] if isinstance(entry, dict) else entry, i)
+    _schedule_index_cache[guild_key] = (version, index)
+    return index
+
+def get_user_ids(guild_id=None):
+    return list(_get_index(guild_id))
+
+def find_user_index(user_id, guild_id=None):
+    return _get_index(guild_id).get(user_id, -1)
+
+def mutate_default_schedule(mutate):
+    """Edit and save the default schedule with no save able to land in between.
+
+    mutate(schedule, index) gets a fresh copy of the schedule and its {user_id: position}
+    map, edits the copy in place and returns an error message to abort without saving.
+    """
+    with _save_lock:
+        # Both reads match while the lock keeps other saves out
+        schedule = list(get_schedule_snapshot())
+        error = mutate(schedule, _get_index())
+        if error:
+            return error
+        save_schedule(schedule, None)
+    return None
 
 intents = discord.Intents.default()
 intents.members = True
 intents.presences = True
 bot = commands.Bot(command_prefix="!", intents=intents)
 
+# Set in on_ready so on_message can skip the bot's own messages with an int compare
+_BOT_USER_ID = None
+
 
-async def advance_schedule_if_needed():
+async def advance_schedule_if_needed(now=None):
     """Rotate the schedule once the current session time has passed."""
+    global _next_rotate_ts
+    if now is None:
+        now = datetime.now(BRISBANE_TZ)
+
+    # Nothing can rotate before the first entry's session starts
+    if _next_rotate_ts is not None and now < _next_rotate_ts:
+        return
+
+    # Note the version before reading so a save from another thread can be detected below
+    version = _schedule_version.get("default", 0)
     schedule = load_schedule(None)
     if not schedule:
         return
 
     changed = False
-    now = datetime.now(BRISBANE_TZ)
+    next_rotate_ts = None
 
     while schedule:
         first_entry = schedule[0]
@@ -346,7 +649,7 @@ async def advance_schedule_if_needed():
         else:
             first_date_str = format_date(get_date_for_week(0))
 
-        scheduled_date = parse_date_string(first_date_str)
+        scheduled_date = parse_date_string(first_date_str, now)
         if not scheduled_date:
             break
 
@@ -357,7 +660,7 @@ async def advance_schedule_if_needed():
             if schedule:
                 last_entry = schedule[-1]
                 last_date_str = last_entry.get("date", first_date_str) if isinstance(last_entry, dict) else first_date_str
-                last_date = parse_date_string(last_date_str) or scheduled_date
+                last_date = parse_date_string(last_date_str, now) or scheduled_date
             else:
                 last_date = scheduled_date
 
@@ -372,10 +675,20 @@ async def advance_schedule_if_needed():
             schedule.append(completed)
             changed = True
         else:
+            next_rotate_ts = scheduled_date
             break
 
     if changed:
         save_schedule(schedule, None)
+        version += 1
+
+    # Set after saving, since save_schedule clears the cached timestamp. If anyone else
+    # saved since our read, the timestamp may be stale; leave it for the next call to recompute.
+    with _save_lock:
+        if _schedule_version.get("default", 0) == version:
+            _next_rotate_ts = next_rotate_ts
+
+    if changed:
         await update_all_schedule_messages()
 
 async def refresh_member_names(guild: discord.Guild):
@@ -383,6 +696,10 @@ async def refresh_member_names(guild: discord.Guild):
     if not guild:
         return
     
+    # get_member only sees cached members, so make sure the guild is chunked
+    if not guild.chunked:
+        await guild.chunk(cache=True)
+    
     schedule = load_schedule(None)
     updated = False
     
@@ -402,15 +719,9 @@ async def refresh_member_names(guild: discord.Guild):
     if updated:
         save_schedule(schedule, None)
 
-async def format_schedule(guild: discord.Guild, guild_id=None):
-    """Format schedule for display."""
-    # Refresh all member names from Discord first
-    await refresh_member_names(guild)
-    
-    # Always use "default" schedule (guild_id=None means use default key)
-    schedule = load_schedule(None)
-    text = ""
-    updated = False
+def _render_schedule(guild, schedule):
+    """Render schedule as display text without modifying it."""
+    parts = []
     
     # Add upcoming week header if schedule exists
     if schedule:
@@ -421,9 +732,10 @@ async def format_schedule(guild: discord.Guild, guild_id=None):
             upcoming_name = None
         
         if upcoming_name:
-            text += f"# Upcoming Week: {upcoming_name}\n\n"
+            parts.append(f"# Upcoming Week: {upcoming_name}")
+            parts.append("")
     
-    text += "**Bible Study Leader Schedule:**\n"
+    parts.append("**Bible Study Leader Schedule:**")
     
     for i, entry in enumerate(schedule):
         if isinstance(entry, dict):
@@ -435,21 +747,31 @@ async def format_schedule(guild: discord.Guild, guild_id=None):
             stored_name = None
             date_str = format_date(get_date_for_week(i))
         
+        # refresh_member_names has already synced stored names
         member = guild.get_member(user_id) if guild else None
         if member:
-            current_name = member.display_name
-            if not isinstance(entry, dict) or entry.get("name") != current_name:
-                schedule[i] = {"id": user_id, "name": current_name, "date": date_str}
-                updated = True
-            name = current_name
+            name = member.display_name
         else:
             name = stored_name if stored_name else f"(Unknown) {user_id}"
         
-        text += f"**{date_str}:** {name}\n"
+        parts.append(f"**{date_str}:** {name}")
     
-    if updated:
-        save_schedule(schedule, guild_id)
+    return "\n".join(parts)
+
+async def format_schedule(guild: discord.Guild, guild_id=None):
+    """Format schedule for display."""
+    # Refresh all member names from Discord first
+    await refresh_member_names(guild)
+    
+    cache_key = guild.id if guild else None
+    version = _schedule_version.get("default", 0)
+    cached = _format_cache.get(cache_key)
+    if cached and cached[0] == version:
+        return cached[1]
     
+    # Always use "default" schedule (guild_id=None means use default key)
+    text = _render_schedule(guild, load_schedule(None))
+    _format_cache[cache_key] = (version, text)
     return text
 
 class ScheduleView(discord.ui.View):
@@ -468,9 +790,8 @@ class ScheduleView(discord.ui.View):
     async def pass_week(self, interaction: discord.Interaction, button: discord.ui.Button):
         schedule = load_schedule(None)
         user_id = interaction.user.id
-        user_ids = get_user_ids(schedule)
 
-        if user_id not in user_ids:
+        if find_user_index(user_id) == -1:
             return await interaction.response.send_message(
                 "You are not in the schedule.", ephemeral=True
             )
@@ -509,43 +830,62 @@ class ScheduleView(discord.ui.View):
 
         await interaction.response.edit_message(
             content=f"**They passed! Next leader for {next_date}:**\n\n" + updated,
-            view=ScheduleView(self.guild)
+            view=_view_for(self.guild)
         )
         
         await update_all_schedule_messages()
 
+# One persistent ScheduleView per guild id, reused for every message edit
+_view_cache = {}
+
+def _view_for(guild):
+    """Return the cached ScheduleView for a guild, creating it on first use."""
+    key = guild.id if guild else None
+    view = _view_cache.get(key)
+    if view is None:
+        view = _view_cache[key] = ScheduleView(guild)
+    return view
+
 active_messages = load_active_messages()
 
+async def _refresh_one(msg_info, schedule_texts):
+    """Edit one tracked message; return its id if it should no longer be tracked."""
+    guild = bot.get_guild(msg_info["guild_id"])
+    if not guild:
+        return msg_info["message_id"]
+        
+    channel = guild.get_channel(msg_info["channel_id"])
+    if not channel:
+        return msg_info["message_id"]
+    
+    try:
+        message = await channel.fetch_message(msg_info["message_id"])
+        await message.edit(content=schedule_texts[guild.id], view=_view_for(guild))
+    except discord.NotFound:
+        return msg_info["message_id"]
+    except discord.Forbidden:
+        return msg_info["message_id"]
+    return None
+
 async def update_all_schedule_messages():
-    global active_messages
-    messages_to_remove = []
+    # Snapshot so /schedule can register messages while we await
+    snapshot = list(active_messages.values())
     
-    for msg_info in active_messages:
-        try:
-            guild = bot.get_guild(msg_info["guild_id"])
-            if not guild:
-                messages_to_remove.append(msg_info)
-                continue
-                
-            channel = guild.get_channel(msg_info["channel_id"])
-            if not channel:
-                messages_to_remove.append(msg_info)
-                continue
-            
-            try:
-                message = await channel.fetch_message(msg_info["message_id"])
-                text = await format_schedule(guild, None)
-                await message.edit(content=text, view=ScheduleView(guild))
-            except discord.NotFound:
-                messages_to_remove.append(msg_info)
-            except discord.Forbidden:
-                messages_to_remove.append(msg_info)
-        except Exception:
-            pass
+    # Render the schedule once per guild and reuse it for every pinned message
+    schedule_texts = {}
+    for msg_info in snapshot:
+        guild = bot.get_guild(msg_info["guild_id"])
+        if guild and guild.id not in schedule_texts:
+            schedule_texts[guild.id] = await format_schedule(guild, None)
+    
+    results = await asyncio.gather(
+        *(_refresh_one(msg_info, schedule_texts) for msg_info in snapshot),
+        return_exceptions=True
+    )
     
-    for msg_info in messages_to_remove:
-        if msg_info in active_messages:
-            active_messages.remove(msg_info)
+    for result in results:
+        if result is not None and not isinstance(result, BaseException):
+            active_messages.pop(result, None)
     
     save_active_messages(active_messages)
 
@@ -554,11 +894,10 @@ async def show_schedule(interaction: discord.Interaction):
     if interaction.guild.id != ALLOWED_GUILD_ID:
         return await interaction.response.send_message("❌ This bot only works in the designated server.", ephemeral=True)
     
-    global active_messages
     text = await format_schedule(interaction.guild, None)
     await interaction.response.send_message(
         content=text,
-        view=ScheduleView(interaction.guild)
+        view=_view_for(interaction.guild)
     )
     
     message = await interaction.original_response()
@@ -568,8 +907,7 @@ async def show_schedule(interaction: discord.Interaction):
         "message_id": message.id
     }
     
-    active_messages = [m for m in active_messages if m["message_id"] != message.id]
-    active_messages.append(msg_info)
+    active_messages[message.id] = msg_info
     save_active_messages(active_messages)
 
 @bot.tree.command(name="add", description="Add a leader to the schedule.")
@@ -592,7 +930,7 @@ async def remove_user(interaction: discord.Interaction, user: discord.Member):
         return await interaction.response.send_message("❌ This bot only works in the designated server.", ephemeral=True)
     
     schedule = load_schedule(None)
-    index = find_user_index(schedule, user.id)
+    index = find_user_index(user.id)
     
     if index == -1:
         return await interaction.response.send_message(
@@ -609,12 +947,13 @@ async def remove_user(interaction: discord.Interaction, user: discord.Member):
 last_reminder_date = None
 last_6h_reminder_time = None
 
-async def send_24h_reminders():
+async def send_24h_reminders(now=None):
     """Send DM reminders to leaders 24 hours before their session."""
     global last_reminder_date
-    now = datetime.now(BRISBANE_TZ)
+    if now is None:
+        now = datetime.now(BRISBANE_TZ)
 
-    next_study = get_next_study_time()
+    next_study = get_next_study_time(now)
 
     # Prevent multiple sends for the same study date
     if last_reminder_date == next_study.date():
@@ -645,16 +984,17 @@ async def send_24h_reminders():
     except Exception as e:
         print(f"Error in send_24h_reminders: {e}")
 
-async def send_6h_reminders():
+async def send_6h_reminders(now=None):
     """Send channel ping reminders to leaders 6 hours before their session."""
     global last_6h_reminder_time
-    now = datetime.now(BRISBANE_TZ)
+    if now is None:
+        now = datetime.now(BRISBANE_TZ)
 
     if last_6h_reminder_time and (now - last_6h_reminder_time).total_seconds() < 3600:
         return
 
     try:
-        next_study = get_next_study_time()
+        next_study = get_next_study_time(now)
         time_until = (next_study - now).total_seconds()
 
         if 5.5 * 3600 < time_until < 6.5 * 3600:
@@ -680,9 +1020,82 @@ async def send_6h_reminders():
     except Exception as e:
         print(f"Error in send_6h_reminders: {e}")
 
+# Dashboard fields per non-bot member id as (lowercase sort key, member dict).
+# Member events reformat only the member they're about.
+_member_entries = {}
+
+# The entries above as (ids, member dicts) sorted by name.
+# Member events only mark it dirty; the next dashboard request re-sorts it.
+_member_cache = {"snapshot": ([], []), "dirty": True}
+
+def _set_member_entry(member):
+    """Format and store the dashboard fields for one member."""
+    if member.bot:
+        return
+    name = member.display_name
+    _member_entries[member.id] = (name.lower(), {
+        "id": str(member.id),
+        "name": name,
+        "username": str(member),
+        "status": str(getattr(member, "status", "offline")),
+        "avatar": str(member.display_avatar.url) if member.display_avatar else None
+    })
+    _member_cache["dirty"] = True
+
+def get_cached_members():
+    """Return (ids, members) for all non-bot guild members, re-sorting if stale."""
+    if _member_cache["dirty"]:
+        # Clear first so events that arrive during the rebuild mark it dirty again
+        _member_cache["dirty"] = False
+        entries = sorted(_member_entries.items(), key=lambda item: item[1][0])
+        _member_cache["snapshot"] = ([member_id for member_id, _ in entries], [data for _, (_, data) in entries])
+    return _member_cache["snapshot"]
+
+# user id -> id of a guild they're in, so member lookups skip walking every guild
+_user_guild_map = {}
+
+def find_member(user_id):
+    """Return the guild Member for user_id, or None if they share no guild with the bot."""
+    guild = bot.get_guild(_user_guild_map.get(user_id, 0))
+    return guild.get_member(user_id) if guild else None
+
+@bot.event
+async def on_member_join(member: discord.Member):
+    _set_member_entry(member)
+    _user_guild_map.setdefault(member.id, member.guild.id)
+
+@bot.event
+async def on_member_remove(member: discord.Member):
+    if _user_guild_map.get(member.id) == member.guild.id:
+        # Point at another shared guild if there is one
+        other = next((g for g in bot.guilds if g.get_member(member.id)), None)
+        if other:
+            _user_guild_map[member.id] = other.id
+        else:
+            _user_guild_map.pop(member.id, None)
+
+    remaining = find_member(member.id)
+    if remaining:
+        _set_member_entry(remaining)
+    elif _member_entries.pop(member.id, None):
+        _member_cache["dirty"] = True
+
+@bot.event
+async def on_presence_update(before: discord.Member, after: discord.Member):
+    _set_member_entry(after)
+
+@bot.event
+async def on_user_update(before: discord.User, after: discord.User):
+    # Global avatar and username changes arrive here rather than as member updates
+    member = find_member(after.id)
+    if member:
+        _set_member_entry(member)
+
 @bot.event
 async def on_member_update(before: discord.Member, after: discord.Member):
     """Handle member updates (nickname changes, etc.)"""
+    _set_member_entry(after)
+    
     # Only update for allowed guild
     if after.guild.id != ALLOWED_GUILD_ID:
         return
@@ -692,10 +1105,10 @@ async def on_member_update(before: discord.Member, after: discord.Member):
         return
     
     # Find user in schedule and update their name
-    schedule = load_schedule(None)
-    index = find_user_index(schedule, after.id)
+    index = find_user_index(after.id)
     
     if index != -1:
+        schedule = load_schedule(None)
         entry = schedule[index]
         if isinstance(entry, dict):
             entry["name"] = after.display_name
@@ -708,28 +1121,20 @@ async def on_member_update(before: discord.Member, after: discord.Member):
 async def on_message(message):
     """Handle incoming DMs from users."""
     # Ignore bot's own messages
-    if message.author == bot.user:
+    if message.author.id == _BOT_USER_ID:
         return
     
     # Only process DMs (private channels)
-    if isinstance(message.channel, discord.DMChannel):
+    if message.channel.type is discord.ChannelType.private:
         # Store the message with username
         try:
-            messages = load_chat_history()
-            messages.append({
+            _append_jsonl(CHAT_HISTORY_FILE, {
                 "from": f"user_{message.author.id}",
                 "username": message.author.name,
                 "user_id": str(message.author.id),
                 "text": message.content,
                 "timestamp": datetime.now(BRISBANE_TZ).isoformat()
             })
-            
-            # Keep only last 100 messages
-            if len(messages) > 100:
-                messages = messages[-100:]
-            
-            with open(CHAT_HISTORY_FILE, "w") as f:
-                json.dump(messages, f, indent=4)
         except Exception as e:
             print(f"Error saving message: {e}")
         
@@ -738,35 +1143,139 @@ async def on_message(message):
     # Process commands
     await bot.process_commands(message)
 
+@bot.event
+async def on_disconnect():
+    # Make sure any coalesced schedule save reaches disk
+    flush_schedule()
+
 @bot.event
 async def on_ready():
+    global _BOT_USER_ID
+    _BOT_USER_ID = bot.user.id
     print(f"Logged in as {bot.user}")
     await bot.tree.sync()
     print("Slash commands synced.")
+    for guild in bot.guilds:
+        if not guild.chunked:
+            await guild.chunk(cache=True)
+        for member in guild.members:
+            _user_guild_map.setdefault(member.id, guild.id)
+            _set_member_entry(member)
     bot.add_view(ScheduleView(None))
     
     async def reminder_loop():
+        last_compaction = datetime.now(BRISBANE_TZ)
         while True:
-            await asyncio.sleep(60)
-            await advance_schedule_if_needed()
-            await send_24h_reminders()
-            await send_6h_reminders()
+            now = datetime.now(BRISBANE_TZ)
+            await advance_schedule_if_needed(now)
+            await send_24h_reminders(now)
+            await send_6h_reminders(now)
+
+            if now - last_compaction >= LOG_COMPACT_INTERVAL:
+                compact_logs()
+                last_compaction = now
+
+            # Sleep until the next reminder window or study time instead of polling
+            await asyncio.sleep(get_reminder_sleep_seconds())
     
     bot.loop.create_task(reminder_loop())
 
+# Strong references to fire-and-forget tasks so they aren't collected mid-run
+_background_tasks = set()
+
+def _schedule(coro_fn, *args):
+    """Start coro_fn(*args) on the bot loop from another thread without waiting on it."""
+    loop = bot.loop
+
+    def start():
+        task = loop.create_task(coro_fn(*args))
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+
+    loop.call_soon_threadsafe(start)
+
 def trigger_discord_update():
+    """Refresh Discord schedule messages once a burst of dashboard edits settles."""
+    global _discord_update_timer
+    with _discord_update_lock:
+        if _discord_update_timer is not None:
+            _discord_update_timer.cancel()
+        _discord_update_timer = Timer(DISCORD_UPDATE_DELAY, _run_discord_update)
+        _discord_update_timer.daemon = True
+        _discord_update_timer.start()
+
+_discord_update_lock = Lock()
+_discord_update_timer = None
+
+def _run_discord_update():
     try:
         loop = bot.loop
         if loop and loop.is_running():
-            asyncio.run_coroutine_threadsafe(update_all_schedule_messages(), loop)
+            _schedule(update_all_schedule_messages)
     except Exception as e:
         print(f"Error triggering Discord update: {e}")
 
+class ORJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson."""
+
+    sort_keys = False
+    compact = True
+
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_NON_STR_KEYS
+        if kwargs.get("sort_keys", self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get("indent"):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 app.config['SESSION_TYPE'] = 'filesystem'
 app.config['SECRET_KEY'] = 'bible-study-bot-secret'
 Session(app)
 
+def ojson(data, status=200):
+    """Return data as a JSON response straight from orjson's bytes."""
+    return Response(orjson.dumps(data), status=status, mimetype="application/json")
+
+# Request bodies for the schedule edit endpoints. Decoding is non-strict so the
+# string ids the dashboard sends are converted to ints.
+class ScheduleEntryBody(msgspec.Struct):
+    id: int
+    name: str
+    date: str | None = None
+
+class ReorderBody(msgspec.Struct):
+    schedule: list[ScheduleEntryBody] = []
+
+class UpdateDateBody(msgspec.Struct):
+    id: int
+    date: str
+
+class AddUserBody(msgspec.Struct):
+    id: int
+    name: str
+
+class RemoveUserBody(msgspec.Struct):
+    id: int
+
+def decode_body(body_type):
+    """Validate the raw request body straight into body_type."""
+    return msgspec.json.decode(request.get_data(), type=body_type, strict=False)
+
+def stream_json_list(key, items):
+    """Stream {"success": true, key: [...]} one item at a time to keep peak memory flat."""
+    def generate():
+        yield b'{"success":true,' + orjson.dumps(key) + b':['
+        for i, item in enumerate(items):
+            yield (b"," if i else b"") + orjson.dumps(item)
+        yield b"]}"
+    return Response(generate(), mimetype="application/json")
+
 # Health check endpoint for cron jobs / uptime monitors
 @app.route('/health')
 def health():
@@ -811,18 +1320,19 @@ def home():
 @app.route('/api/update-date', methods=['POST'])
 def update_date():
     try:
-        data = request.get_json()
-        user_id = int(data.get('id'))
-        new_date = data.get('date')
+        body = decode_body(UpdateDateBody)
         
-        schedule = load_schedule(None)
-        for entry in schedule:
-            if entry.get('id') == user_id:
-                entry['date'] = new_date
-                break
+        def set_date(schedule, index):
+            position = index.get(body.id)
+            if position is None:
+                return "User not in schedule"
+            # Published snapshots are never mutated, so replace the entry instead of editing it
+            schedule[position] = {**schedule[position], "date": body.date}
         
-        save_schedule(schedule, None)
-        asyncio.run_coroutine_threadsafe(update_all_schedule_messages(), bot.loop)
+        error = mutate_default_schedule(set_date)
+        if error:
+            return jsonify({"success": False, "error": error})
+        trigger_discord_update()
         return jsonify({"success": True})
     except Exception as e:
         return jsonify({"success": False, "error": str(e)})
@@ -830,7 +1340,7 @@ def update_date():
 
 def build_schedule_view_data():
     """Return schedule entries with formatted dates for display."""
-    current_schedule = load_schedule(None)
+    current_schedule = get_schedule_snapshot()
     schedule_data = []
     for i, entry in enumerate(current_schedule):
         if isinstance(entry, dict):
@@ -860,16 +1370,16 @@ def api_schedule():
 @app.route('/api/reorder', methods=['POST'])
 def reorder_schedule():
     try:
-        data = request.get_json()
-        new_order = data.get('schedule', [])
+        body = decode_body(ReorderBody)
         
-        converted_order = []
-        for entry in new_order:
-            converted_order.append({
-                "id": int(entry["id"]) if isinstance(entry["id"], str) else entry["id"],
-                "name": entry["name"],
-                "date": entry.get("date", format_date(get_date_for_week(len(converted_order))))
-            })
+        converted_order = [
+            {
+                "id": entry.id,
+                "name": entry.name,
+                "date": entry.date if entry.date is not None else format_date(get_date_for_week(i))
+            }
+            for i, entry in enumerate(body.schedule)
+        ]
         
         save_schedule(converted_order, None)
         trigger_discord_update()
@@ -881,22 +1391,10 @@ def reorder_schedule():
 @app.route('/api/members')
 def get_members():
     try:
-        members_list = []
-        current_user_ids = get_user_ids(load_schedule(None))
-        
-        for guild in bot.guilds:
-            for member in guild.members:
-                if not member.bot and member.id not in current_user_ids:
-                    members_list.append({
-                        "id": str(member.id),
-                        "name": member.display_name,
-                        "username": str(member),
-                        "status": str(getattr(member, "status", "offline")),
-                        "avatar": str(member.display_avatar.url) if member.display_avatar else None
-                    })
-        
-        members_list.sort(key=lambda x: x["name"].lower())
-        return jsonify({"success": True, "members": members_list})
+        current_user_ids = frozenset(get_user_ids())
+        member_ids, members = get_cached_members()
+        members_list = [data for member_id, data in zip(member_ids, members) if member_id not in current_user_ids]
+        return ojson({"success": True, "members": members_list})
     except Exception as e:
         return jsonify({"success": False, "error": str(e), "members": []})
 
@@ -905,43 +1403,24 @@ def get_members():
 def get_server_members():
     """Return all non-bot members with profile pictures and status."""
     try:
-        members_list = []
-
-        for guild in bot.guilds:
-            for member in guild.members:
-                if member.bot:
-                    continue
-
-                status = str(getattr(member, "status", "offline"))
-                avatar_url = str(member.display_avatar.url) if member.display_avatar else None
-
-                members_list.append({
-                    "id": str(member.id),
-                    "name": member.display_name,
-                    "username": str(member),
-                    "status": status,
-                    "avatar": avatar_url
-                })
-
-        members_list.sort(key=lambda x: x["name"].lower())
-        return jsonify({"success": True, "members": members_list})
+        _, members = get_cached_members()
+        return ojson({"success": True, "members": members})
     except Exception as e:
         return jsonify({"success": False, "error": str(e), "members": []})
 
 @app.route('/api/add', methods=['POST'])
 def api_add_user():
     try:
-        data = request.get_json()
-        user_id = int(data.get('id'))
-        user_name = data.get('name')
+        body = decode_body(AddUserBody)
         
-        schedule = load_schedule(None)
-        user_ids = get_user_ids(schedule)
-        if user_id in user_ids:
-            return jsonify({"success": False, "error": "User already in schedule"})
+        def add_user(schedule, index):
+            if body.id in index:
+                return "User already in schedule"
+            schedule.append({"id": body.id, "name": body.name, "date": format_date(get_next_schedule_date(schedule))})
         
-        schedule.append({"id": user_id, "name": user_name, "date": format_date(get_next_schedule_date(schedule))})
-        save_schedule(schedule, None)
+        error = mutate_default_schedule(add_user)
+        if error:
+            return jsonify({"success": False, "error": error})
         trigger_discord_update()
         
         return jsonify({"success": True})
@@ -951,37 +1430,45 @@ def api_add_user():
 @app.route('/api/remove', methods=['POST'])
 def api_remove_user():
     try:
-        data = request.get_json()
-        user_id = int(data.get('id'))
+        body = decode_body(RemoveUserBody)
         
-        schedule = load_schedule(None)
-        index = find_user_index(schedule, user_id)
-        if index == -1:
-            return jsonify({"success": False, "error": "User not in schedule"})
+        def remove_user(schedule, index):
+            position = index.get(body.id)
+            if position is None:
+                return "User not in schedule"
+            schedule.pop(position)
         
-        schedule.pop(index)
-        save_schedule(schedule, None)
+        error = mutate_default_schedule(remove_user)
+        if error:
+            return jsonify({"success": False, "error": error})
         trigger_discord_update()
         
         return jsonify({"success": True})
     except Exception as e:
         return jsonify({"success": False, "error": str(e)})
 
+# Encoded countdown response for the current wall-clock second, shared by every poller
+_countdown_cache = {"second": None, "body": b""}
+
 @app.route('/api/countdown')
 def get_countdown_api():
     try:
-        countdown_seconds = get_countdown()
-        hours = countdown_seconds // 3600
-        minutes = (countdown_seconds % 3600) // 60
-        seconds = countdown_seconds % 60
-        return jsonify({
-            "success": True,
-            "seconds": countdown_seconds,
-            "hours": hours,
-            "minutes": minutes,
-            "seconds_display": seconds,
-            "formatted": f"{hours}h {minutes}m {seconds}s"
-        })
+        second = int(time.time())
+        if _countdown_cache["second"] != second:
+            countdown_seconds = get_countdown()
+            hours = countdown_seconds // 3600
+            minutes = (countdown_seconds % 3600) // 60
+            seconds = countdown_seconds % 60
+            _countdown_cache["body"] = orjson.dumps({
+                "success": True,
+                "seconds": countdown_seconds,
+                "hours": hours,
+                "minutes": minutes,
+                "seconds_display": seconds,
+                "formatted": f"{hours}h {minutes}m {seconds}s"
+            })
+            _countdown_cache["second"] = second
+        return Response(_countdown_cache["body"], mimetype="application/json")
     except Exception as e:
         return jsonify({"success": False, "error": str(e)})
 
@@ -1020,23 +1507,15 @@ def test_24h_reminder():
     
     try:
         def send_test_reminder():
-            current_schedule = load_schedule(None)
-            if not current_schedule:
+            reminder = get_test_reminder_messages()
+            if not reminder:
                 return False
 
-            leader_entry = current_schedule[0]
-            leader_id = leader_entry["id"] if isinstance(leader_entry, dict) else leader_entry
-
-            for guild in bot.guilds:
-                member = guild.get_member(leader_id)
-                if member:
-                    next_study = get_next_study_time()
-                    study_timestamp = int(next_study.timestamp())
-                    asyncio.run_coroutine_threadsafe(
-                        member.send(f"📖 Test Reminder (24h): You're leading Bible Study on <t:{study_timestamp}:F> (<t:{study_timestamp}:R>)!"),
-                        bot.loop
-                    )
-                    return True
+            leader_id, message, _ = reminder
+            member = find_member(leader_id)
+            if member:
+                _schedule(member.send, message)
+                return True
             return False
         
         success = send_test_reminder()
@@ -1054,13 +1533,10 @@ def get_dm_log():
         return jsonify({"success": False, "error": "Not authenticated", "logs": []})
     
     try:
-        logs = []
-        if os.path.exists(DM_LOG_FILE):
-            with open(DM_LOG_FILE, "r") as f:
-                logs = json.load(f)
+        logs = load_dm_log()
         
         # Return in reverse order (most recent first)
-        return jsonify({"success": True, "logs": logs[::-1]})
+        return stream_json_list("logs", reversed(logs))
     except Exception as e:
         return jsonify({"success": False, "error": str(e), "logs": []})
 
@@ -1107,7 +1583,7 @@ def get_chat_history():
     
     try:
         messages = load_chat_history()
-        return jsonify({"success": True, "messages": messages})
+        return stream_json_list("messages", messages)
     except Exception as e:
         return jsonify({"success": False, "error": str(e), "messages": []})
 
@@ -1127,55 +1603,39 @@ def send_chat_message():
         if not user_id:
             return jsonify({"success": False, "error": "User ID required"})
         
+        user_id_int = int(user_id)
+        # Failures we can spot up front are still reported straight away
+        if not bot.is_ready():
+            return jsonify({"success": False, "error": "Bot not ready"})
+        
         # Save to chat history
         save_chat_message("admin", text)
         
-        # Send actual Discord DM to the user
-        def send_dm():
-            try:
-                user_id_int = int(user_id)
-                
-                # Try to find user in guild first
-                for guild in bot.guilds:
-                    member = guild.get_member(user_id_int)
-                    if member:
-                        asyncio.run_coroutine_threadsafe(
-                            member.send(text),
-                            bot.loop
-                        )
-                        return True
-                
-                # If not in guild, try to fetch user directly
-                user = bot.get_user(user_id_int)
-                if user:
-                    asyncio.run_coroutine_threadsafe(
-                        user.send(text),
-                        bot.loop
-                    )
-                    return True
-                else:
-                    # Try to fetch the user (this is async but we'll handle it)
-                    async def fetch_and_send():
-                        try:
-                            user = await bot.fetch_user(user_id_int)
-                            await user.send(text)
-                            return True
-                        except Exception as e:
-                            print(f"Error fetching/sending DM to {user_id}: {e}")
-                            return False
-                    
-                    future = asyncio.run_coroutine_threadsafe(fetch_and_send(), bot.loop)
-                    return future.result(timeout=5)
-                    
-            except Exception as e:
-                print(f"Error sending DM to {user_id}: {e}")
-            return False
+        # Send the Discord DM in the background; the outcome lands in the DM log, where the
+        # dashboard looks for a chat_message entry for this user stamped at or after sent_at
+        sent_at = datetime.now(BRISBANE_TZ).isoformat()
+        async def send_dm():
+            # Try to find user in guild first, then the user cache, then fetch them
+            member = find_member(user_id_int)
+            if member:
+                await member.send(text)
+                return member.display_name
+            
+            user = bot.get_user(user_id_int) or await bot.fetch_user(user_id_int)
+            await user.send(text)
+            return user.name
         
-        success = send_dm()
-        if success:
-            return jsonify({"success": True})
-        else:
-            return jsonify({"success": False, "error": "Could not send DM - user not found or bot lacking permissions"})
+        def log_result(future):
+            error = future.exception()
+            if error is None:
+                log_dm(user_id, future.result(), "chat_message", "sent")
+            else:
+                print(f"Error sending DM to {user_id}: {error}")
+                log_dm(user_id, "Unknown", "chat_message", "failed")
+        
+        future = asyncio.run_coroutine_threadsafe(send_dm(), bot.loop)
+        future.add_done_callback(log_result)
+        return jsonify({"success": True, "pending": True, "sent_at": sent_at})
     except Exception as e:
         print(f"Exception in send_chat_message: {e}")
         return jsonify({"success": False, "error": str(e)})
@@ -1187,14 +1647,12 @@ def delete_user_conversation(user_id):
         return jsonify({"success": False, "error": "Not authenticated"})
     
     try:
-        messages = load_chat_history()
-        user_from = f"user_{user_id}"
-        
-        # Remove all messages from this user
-        messages = [msg for msg in messages if msg.get("from") != user_from]
-        
-        with open(CHAT_HISTORY_FILE, "w") as f:
-            json.dump(messages, f, indent=4)
+        # Record a delete op; readers drop this user's earlier messages when they load
+        _append_jsonl(CHAT_HISTORY_FILE, {
+            "op": "delete",
+            "from": f"user_{user_id}",
+            "timestamp": datetime.now(BRISBANE_TZ).isoformat()
+        })
         
         return jsonify({"success": True})
     except Exception as e:
@@ -1213,16 +1671,13 @@ def rename_user(user_id):
         if not new_name:
             return jsonify({"success": False, "error": "Name cannot be empty"})
         
-        messages = load_chat_history()
-        user_from = f"user_{user_id}"
-        
-        # Update username for all messages from this user
-        for msg in messages:
-            if msg.get("from") == user_from:
-                msg["username"] = new_name
-        
-        with open(CHAT_HISTORY_FILE, "w") as f:
-            json.dump(messages, f, indent=4)
+        # Record a rename op; readers update this user's earlier messages when they load
+        _append_jsonl(CHAT_HISTORY_FILE, {
+            "op": "rename",
+            "from": f"user_{user_id}",
+            "username": new_name,
+            "timestamp": datetime.now(BRISBANE_TZ).isoformat()
+        })
         
         return jsonify({"success": True})
     except Exception as e:
@@ -1273,24 +1728,15 @@ def test_6h_reminder():
     
     try:
         def send_test_6h_reminder():
-            current_schedule = load_schedule(None)
-            if not current_schedule:
+            reminder = get_test_reminder_messages()
+            if not reminder:
                 return False
             
-            leader_entry = current_schedule[0]
-            leader_id = leader_entry["id"] if isinstance(leader_entry, dict) else leader_entry
-            
-            for guild in bot.guilds:
-                if guild.id == ALLOWED_GUILD_ID:
-                    channel = guild.get_channel(REMINDER_CHANNEL_ID)
-                    if channel:
-                        next_study = get_next_study_time()
-                        study_timestamp = int(next_study.timestamp())
-                        asyncio.run_coroutine_threadsafe(
-                            channel.send(f"🧪 Test: <@{leader_id}> - Your Bible Study session is <t:{study_timestamp}:R> 📖"),
-                            bot.loop
-                        )
-                        return True
+            guild = bot.get_guild(ALLOWED_GUILD_ID)
+            channel = guild and guild.get_channel(REMINDER_CHANNEL_ID)
+            if channel:
+                _schedule(channel.send, reminder[2])
+                return True
             return False
 
         
@@ -1302,18 +1748,46 @@ def test_6h_reminder():
     except Exception as e:
         return jsonify({"success": False, "error": str(e)})
 
-def run():
-    app.run(host='0.0.0.0', port=5000)
+def serve_dashboard(shutdown_trigger=None):
+    """Serve the Flask dashboard with hypercorn's WSGI worker on the running event loop."""
+    config = Config()
+    config.bind = ["0.0.0.0:5000"]
+    # WSGI mode runs each request on the loop's thread pool, so requests don't queue behind each other
+    return serve(app, config, mode="wsgi", shutdown_trigger=shutdown_trigger)
+
+async def run_bot_and_dashboard():
+    """Run the bot and the dashboard together on one event loop until either stops or a signal arrives."""
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    async with bot:
+        bot_task = asyncio.create_task(bot.start(TOKEN))
+        dashboard_task = asyncio.create_task(serve_dashboard(stop.wait))
+        stop_task = asyncio.create_task(stop.wait())
+        await asyncio.wait({bot_task, dashboard_task, stop_task}, return_when=asyncio.FIRST_COMPLETED)
+
+        # Take the other side down too so start_services can flush and exit
+        stop.set()
+        await bot.close()
+        await asyncio.gather(bot_task, dashboard_task)
 
 
 def start_services():
-    Thread(target=run).start()
+    _migrate_legacy_log("dm_log.json", DM_LOG_FILE)
+    _migrate_legacy_log("chat_history.json", CHAT_HISTORY_FILE)
 
     if not TOKEN:
         print("ERROR: DISCORD_BOT_TOKEN not found in environment variables!")
         print("Please add your Discord bot token as a secret.")
+        asyncio.run(serve_dashboard())
     else:
-        bot.run(TOKEN)
+        discord.utils.setup_logging()
+        try:
+            asyncio.run(run_bot_and_dashboard())
+        finally:
+            flush_schedule()
 
 
 if __name__ == "__main__":
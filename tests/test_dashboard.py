@@ -1,13 +1,33 @@
+import os
+import tempfile
+import time
 import unittest
+from threading import Thread
 from datetime import datetime, timedelta
 from unittest.mock import patch
 
 from main import (
     app,
     BRISBANE_TZ,
+    format_date,
+    get_date_for_week,
     STUDY_HOUR,
     STUDY_MINUTE,
+    REMINDER_MAX_SLEEP,
     get_next_study_time,
+    get_reminder_sleep_seconds,
+    load_schedule,
+    save_schedule,
+    LOG_HISTORY_LIMIT,
+    _APPEND_HANDLES,
+    _JSON_CACHE,
+    _append_jsonl,
+    _extend_jsonl,
+    _get_index,
+    _read_json,
+    _read_jsonl,
+    _write_json,
+    flush_schedule,
 )
 
 
@@ -26,11 +46,50 @@ class DashboardViewTests(unittest.TestCase):
         self.assertIn("Sat 29/11", html)
 
 
+class ScheduleEditApiTests(unittest.TestCase):
+    def setUp(self):
+        app.config["TESTING"] = True
+        self.client = app.test_client()
+        self.save_patch = patch("main.save_schedule")
+        self.save = self.save_patch.start()
+        self.update_patch = patch("main.trigger_discord_update")
+        self.update_patch.start()
+
+    def tearDown(self):
+        self.update_patch.stop()
+        self.save_patch.stop()
+
+    def test_string_id_is_accepted(self):
+        response = self.client.post("/api/remove", json={"id": "774799037458546718"})
+
+        self.assertTrue(response.get_json()["success"])
+        saved = self.save.call_args[0][0]
+        self.assertNotIn(774799037458546718, [entry["id"] for entry in saved])
+
+    def test_non_numeric_id_is_rejected(self):
+        response = self.client.post("/api/add", json={"id": "abc", "name": "x"})
+
+        self.assertFalse(response.get_json()["success"])
+        self.save.assert_not_called()
+
+    def test_reorder_fills_missing_dates_by_week(self):
+        response = self.client.post("/api/reorder", json={"schedule": [
+            {"id": "5", "name": "a"},
+            {"id": 6, "name": "b", "date": "Sat 01/11"},
+        ]})
+
+        self.assertTrue(response.get_json()["success"])
+        self.assertEqual(self.save.call_args[0][0], [
+            {"id": 5, "name": "a", "date": format_date(get_date_for_week(0))},
+            {"id": 6, "name": "b", "date": "Sat 01/11"},
+        ])
+
+
 class StudyTimeCalculationTests(unittest.TestCase):
     def test_next_study_skips_past_saturday_evening(self):
         """After the study time passes on Saturday, we schedule for the following week."""
 
-        fake_now = BRISBANE_TZ.localize(datetime(2024, 8, 3, 21, 15))
+        fake_now = datetime(2024, 8, 3, 21, 15, tzinfo=BRISBANE_TZ)
 
         with patch("main.load_schedule", return_value=[]), patch("main.datetime") as mock_datetime:
             mock_datetime.now.return_value = fake_now
@@ -43,5 +102,167 @@ class StudyTimeCalculationTests(unittest.TestCase):
         self.assertEqual(next_study.date(), (fake_now + timedelta(days=7)).date())
 
 
+class ReminderSleepTests(unittest.TestCase):
+    def test_sleep_is_capped_when_next_event_is_far_away(self):
+        now = datetime(2024, 8, 5, 9, 0, tzinfo=BRISBANE_TZ)  # Monday
+
+        with patch("main.load_schedule", return_value=[]):
+            self.assertEqual(get_reminder_sleep_seconds(now), REMINDER_MAX_SLEEP)
+
+    def test_sleep_wakes_just_before_24h_reminder(self):
+        now = datetime(2024, 8, 2, 19, 25, tzinfo=BRISBANE_TZ)  # Friday, 5 minutes before
+
+        with patch("main.load_schedule", return_value=[]):
+            self.assertEqual(get_reminder_sleep_seconds(now), 5 * 60 - 30)
+
+
+class JsonCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "data.json")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_missing_file_returns_default_copy(self):
+        default = []
+        result = _read_json(self.path, default)
+        result.append("x")
+        self.assertEqual(default, [])
+
+    def test_reads_are_isolated_from_cache(self):
+        _write_json(self.path, [{"id": 1}])
+
+        first = _read_json(self.path, [])
+        first[0]["id"] = 2
+
+        self.assertEqual(_read_json(self.path, []), [{"id": 1}])
+
+    def test_external_change_invalidates_cache(self):
+        _write_json(self.path, [1])
+        self.assertEqual(_read_json(self.path, []), [1])
+
+        with open(self.path, "w") as f:
+            f.write("[1, 2]")
+        os.utime(self.path, ns=(0, 0))
+
+        self.assertEqual(_read_json(self.path, []), [1, 2])
+
+
+class JsonLinesLogTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "log.jsonl")
+
+    def tearDown(self):
+        handle = _APPEND_HANDLES.pop(self.path, None)
+        if handle is not None:
+            handle.close()
+        self.tmpdir.cleanup()
+
+    def test_reader_keeps_only_the_tail(self):
+        for i in range(LOG_HISTORY_LIMIT + 5):
+            _append_jsonl(self.path, {"n": i})
+
+        records = _read_jsonl(self.path)
+        self.assertEqual(len(records), LOG_HISTORY_LIMIT)
+        self.assertEqual(records[0], {"n": 5})
+        self.assertEqual(records[-1], {"n": LOG_HISTORY_LIMIT + 4})
+
+        with open(self.path) as f:
+            self.assertEqual(sum(1 for _ in f), LOG_HISTORY_LIMIT + 5)
+
+    def test_extend_appends_a_batch_in_one_write(self):
+        _append_jsonl(self.path, {"n": 0})
+        _extend_jsonl(self.path, [{"n": 1}, {"n": 2}])
+
+        self.assertEqual(_read_jsonl(self.path), [{"n": 0}, {"n": 1}, {"n": 2}])
+        _JSON_CACHE.pop(self.path)
+        self.assertEqual(_read_jsonl(self.path), [{"n": 0}, {"n": 1}, {"n": 2}])
+
+    def test_reader_skips_torn_lines(self):
+        _append_jsonl(self.path, {"n": 1})
+        with open(self.path, "ab") as f:
+            f.write(b'{"n": 2, "tex\n')
+        _append_jsonl(self.path, {"n": 3})
+
+        _JSON_CACHE.pop(self.path, None)
+        self.assertEqual(_read_jsonl(self.path), [{"n": 1}, {"n": 3}])
+
+    def test_delete_and_rename_ops_apply_on_read(self):
+        _append_jsonl(self.path, {"from": "user_1", "username": "a", "text": "hi"})
+        _append_jsonl(self.path, {"from": "user_2", "username": "b", "text": "yo"})
+        _append_jsonl(self.path, {"op": "rename", "from": "user_2", "username": "bee"})
+        _append_jsonl(self.path, {"op": "delete", "from": "user_1"})
+
+        expected = [{"from": "user_2", "username": "bee", "text": "yo"}]
+        self.assertEqual(_read_jsonl(self.path), expected)
+
+        # A cold read replays the same ops from disk
+        _JSON_CACHE.pop(self.path)
+        self.assertEqual(_read_jsonl(self.path), expected)
+
+
+class ScheduleWriteBehindTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "schedule.json")
+        self.file_patch = patch("main.SCHEDULE_FILE", self.path)
+        self.file_patch.start()
+        self.snapshot_patch = patch("main._schedule_snapshot", [])
+        self.snapshot_patch.start()
+
+    def tearDown(self):
+        self.snapshot_patch.stop()
+        self.file_patch.stop()
+        self.tmpdir.cleanup()
+
+    def test_rapid_saves_are_coalesced_into_one_write(self):
+        with patch("main.SCHEDULE_FLUSH_DELAY", 0.01), patch("main._write_json", wraps=_write_json) as write:
+            save_schedule([{"id": 1, "name": "a", "date": "Sat 29/11"}])
+            save_schedule([{"id": 2, "name": "b", "date": "Sat 06/12"}])
+
+            self.assertFalse(os.path.exists(self.path))
+            self.assertEqual(load_schedule()[0]["id"], 2)
+
+            time.sleep(0.05)
+
+        self.assertEqual(write.call_count, 1)
+        self.assertEqual(_read_json(self.path, {})["schedules"]["default"][0]["id"], 2)
+
+    def test_save_between_lookup_and_edit_cannot_shift_the_row(self):
+        original = [{"id": i, "name": str(i), "date": "Sat 29/11"} for i in (1, 2, 3)]
+        racer = Thread(target=save_schedule, args=(original[::-1],))
+
+        def lookup_then_race(*args):
+            index = _get_index(*args)
+            # Without the lock this reversing save lands before the row is edited
+            racer.start()
+            racer.join(0.05)
+            return index
+
+        with patch("main.SCHEDULE_FLUSH_DELAY", 60), patch("main.trigger_discord_update"):
+            save_schedule(original)
+            with patch("main._get_index", side_effect=lookup_then_race), \
+                    patch("main.save_schedule", wraps=save_schedule) as save:
+                response = app.test_client().post("/api/remove", json={"id": 1})
+            racer.join()
+
+        self.assertTrue(response.get_json()["success"])
+        self.assertEqual([entry["id"] for entry in save.call_args_list[0][0][0]], [2, 3])
+
+    def test_pending_save_is_served_over_a_stale_file_cache(self):
+        with patch("main.SCHEDULE_FLUSH_DELAY", 60):
+            save_schedule([{"id": 1, "name": "a", "date": "Sat 29/11"}])
+
+            # A reader racing the save put the file's older contents back in the cache
+            _JSON_CACHE[self.path] = (None, {"schedules": {"default": []}})
+            self.assertEqual(load_schedule()[0]["id"], 1)
+
+            flush_schedule()
+
+        self.assertEqual(load_schedule()[0]["id"], 1)
+        self.assertEqual(_read_json(self.path, {})["schedules"]["default"][0]["id"], 1)
+
 if __name__ == "__main__":
     unittest.main()